@@ -1,11 +1,12 @@
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse, PlainTextResponse, FileResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse, FileResponse, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from contextlib import asynccontextmanager
 import asyncio
+import orjson
 from pathlib import Path
 from src.config import settings
 from src.databases import db
@@ -19,6 +20,7 @@ from src.routes import (
     dependencies_router,
 )
 from src.services.scheduler import scheduler
+from src.services.scripts import script_service
 from src.services.auth import initialize_admin_user
 from src.services.notifiers import initialize_notifications
 from src.utils import logger, error_response, success_response
@@ -26,31 +28,48 @@ from src.middleware import AuthMiddleware
 from src import __version__
 
 
+def _on_scheduler_done(task: asyncio.Task) -> None:
+    """Log the scheduler task dying outside of a normal shutdown"""
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.error(f"Scheduler task died: {type(exc).__name__}: {exc}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    logger.start()
     logger.info("Application starting...")
+    script_service.ensure_script_dir()
     await db.connect()
+    await db.warm(n=settings.db_pool_size)
 
-    # Initialize admin user
-    await initialize_admin_user()
-
-    # Initialize notification configurations
-    await initialize_notifications()
+    # Initialize admin user and notification configurations concurrently
+    await asyncio.gather(initialize_admin_user(), initialize_notifications())
 
-    asyncio.create_task(scheduler.start())
+    # Keep a reference so the scheduler task cannot be garbage collected
+    scheduler_task = asyncio.create_task(scheduler.start(), name="scheduler")
+    scheduler_task.add_done_callback(_on_scheduler_done)
+    app.state.scheduler_task = scheduler_task
     logger.info("Scheduler started")
     yield
     # Shutdown
     logger.info("Application shutting down...")
     await scheduler.stop()
+    # The loop may be sleeping between polls, so cancel instead of waiting
+    scheduler_task.cancel()
+    await asyncio.gather(scheduler_task, return_exceptions=True)
     await db.disconnect()
     logger.info("Application stopped")
+    logger.stop()
 
 
 app = FastAPI(
     title=settings.app_name,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url=None,
     # openapi_url=None,
     redirect_slashes=False,
@@ -58,13 +77,21 @@ app = FastAPI(
     version=__version__,
 )
 
-# Add authentication middleware first (will be executed last in request chain)
-app.add_middleware(AuthMiddleware)
+# API sub-application; only /api routes go through authentication
+api_app = FastAPI(
+    title=settings.app_name,
+    default_response_class=ORJSONResponse,
+    docs_url=None,
+    redirect_slashes=False,
+    debug=settings.app_debug,
+    version=__version__,
+)
+api_app.add_middleware(AuthMiddleware)
 
-# Add CORS middleware last (will be executed first, wrapping all other middleware)
+# CORS wraps the whole application, including the mounted API
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -73,15 +100,12 @@ app.add_middleware(
 
 
 # Global exception handler for all exceptions
-@app.exception_handler(StarletteHTTPException)
-@app.exception_handler(RequestValidationError)
-@app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Unified exception handler for all exceptions"""
 
     # Handle HTTP exceptions
     if isinstance(exc, StarletteHTTPException):
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content=error_response(
                 message=exc.detail,
@@ -91,7 +115,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 
     # Handle validation errors
     if isinstance(exc, RequestValidationError):
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             content=error_response(
                 message="Validation error", code=422, data={"errors": exc.errors()}
@@ -103,7 +127,17 @@ async def global_exception_handler(request: Request, exc: Exception):
         f"Unhandled exception: {type(exc).__name__}: {str(exc)} - Path: {request.url.path}",
         exc_info=True,
     )
-    return JSONResponse(
+    return _internal_error_response(exc)
+
+
+async def api_exception_handler(request: Request, exc: Exception):
+    """500 JSON for the mounted API; logged once by the outer app's handler"""
+    return _internal_error_response(exc)
+
+
+def _internal_error_response(exc: Exception) -> ORJSONResponse:
+    """Build the 500 response body"""
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content=error_response(
             message="Internal server error",
@@ -117,6 +151,16 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+# Mounted apps handle their own HTTP/validation errors, so register those on
+# both. ServerErrorMiddleware re-raises after its handler, so an unhandled /api
+# error also reaches the outer app: only that handler logs it.
+for application in (app, api_app):
+    for exc_class in (StarletteHTTPException, RequestValidationError):
+        application.add_exception_handler(exc_class, global_exception_handler)
+app.add_exception_handler(Exception, global_exception_handler)
+api_app.add_exception_handler(Exception, api_exception_handler)
+
+
 for router in [
     auth_router,
     tasks_router,
@@ -126,17 +170,56 @@ for router in [
     stats_router,
     dependencies_router,
 ]:
-    app.include_router(router, prefix="/api")
+    api_app.include_router(router)
+
+app.mount("/api", api_app)
+
+
+def _merged_openapi() -> dict:
+    """Outer schema plus the mounted API's routes under /api"""
+    if app.openapi_schema is None:
+        schema = FastAPI.openapi(app)
+        api_schema = api_app.openapi()
+        for path, item in api_schema.get("paths", {}).items():
+            schema.setdefault("paths", {})[f"/api{path}"] = item
+        for key, values in api_schema.get("components", {}).items():
+            schema.setdefault("components", {}).setdefault(key, {}).update(values)
+        app.openapi_schema = schema
+    return app.openapi_schema
+
+
+# Mounted apps are invisible to the outer schema, so merge them in
+app.openapi = _merged_openapi
+
+
+# Static payloads, encoded once per process
+_ROBOTS_BODY = b"User-agent: *\nDisallow: /"
+_HEALTH_BODY = orjson.dumps(
+    success_response(
+        data={
+            "name": settings.app_name,
+            "version": __version__,
+            "status": "running",
+        }
+    )
+)
 
 
 @app.get("/robots.txt")
 async def robots_file():
-    return PlainTextResponse("User-agent: *\nDisallow: /")
+    return PlainTextResponse(_ROBOTS_BODY)
 
 
 @app.get("/info")
 async def info(request: Request):
-    headers = {key: value for key, value in request.headers.items()}
+    # Diagnostic endpoint, disabled unless explicitly turned on
+    if not settings.info_endpoint_enabled:
+        raise StarletteHTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    headers = {
+        key.decode("latin-1"): value.decode("latin-1")
+        for key, value in request.scope["headers"]
+    }
     client_host = request.client.host if request.client else None
     client_port = request.client.port if request.client else None
 
@@ -149,20 +232,14 @@ async def info(request: Request):
             "url": str(request.url),
             "base_url": str(request.base_url),
             "headers": headers,
+            "db_pool": db.pool_status(),
         }
     )
 
 
 @app.get("/health")
-def health() -> dict:
-
-    return success_response(
-        data={
-            "name": settings.app_name,
-            "version": __version__,
-            "status": "running",
-        }
-    )
+async def health():
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 # app.mount("/assets", StaticFiles(directory="public/assets"), name="assets")
@@ -176,3 +253,21 @@ def health() -> dict:
 # @app.get("/{path:path}")
 # def spa(path: str):
 #     return FileResponse("public/index.html")
+
+
+# Entry point for both `python main.py` and the Docker image
+if __name__ == "__main__":
+    import uvicorn
+    from src.utils.loop import install_loop
+
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=settings.app_port,
+        reload=settings.app_debug,
+        # workers and reload are mutually exclusive
+        workers=None if settings.app_debug else settings.app_workers,
+        loop=install_loop(),
+        http="httptools",
+        timeout_keep_alive=30,
+    )
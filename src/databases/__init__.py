@@ -1,3 +1,3 @@
-from .db import Database, db
+from .db import Database, db, get_session
 
-__all__ = ["Database", "db"]
+__all__ = ["Database", "db", "get_session"]
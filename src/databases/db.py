@@ -1,11 +1,20 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import orjson
+from sqlalchemy import text
 from sqlalchemy.pool import NullPool
-from typing import AsyncGenerator
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from src.config import settings
 from src.models.tables import Base
 from src.utils import logger
 
 
+def _orjson_dumps(value) -> str:
+    """SQLAlchemy expects the JSON serializer to return str"""
+    return orjson.dumps(value).decode("utf-8")
+
+
 class Database:
     def __init__(self):
         self.engine = None
@@ -14,13 +23,29 @@ class Database:
     async def connect(self) -> None:
         """Create database engine and initialize tables"""
         if not self.engine:
+            if settings.db_null_pool:
+                # An external pooler (PgBouncer) multiplexes the connections
+                pool_options = {"poolclass": NullPool}
+            else:
+                pool_options = {
+                    "pool_size": settings.db_pool_size,
+                    "max_overflow": settings.db_max_overflow,
+                    "pool_timeout": settings.db_pool_timeout,
+                    "pool_recycle": settings.db_pool_recycle,
+                    "pool_pre_ping": True,
+                }
             self.engine = create_async_engine(
                 settings.database_url.replace("postgresql://", "postgresql+asyncpg://"),
-                pool_size=5,
-                max_overflow=10,
-                pool_timeout=30,
-                pool_pre_ping=True,
-                echo=False,
+                **pool_options,
+                connect_args={
+                    "prepared_statement_cache_size": settings.db_statement_cache_size,
+                    "statement_cache_size": settings.db_statement_cache_size,
+                },
+                # JSON/JSONB columns go through orjson instead of stdlib json
+                json_serializer=_orjson_dumps,
+                json_deserializer=orjson.loads,
+                echo=settings.db_echo,
+                echo_pool=False,
             )
             self.session_factory = async_sessionmaker(
                 self.engine, class_=AsyncSession, expire_on_commit=False
@@ -31,6 +56,22 @@ class Database:
                 await conn.run_sync(Base.metadata.create_all)
             logger.info("Database initialized successfully")
 
+    async def warm(self, n: int) -> None:
+        """Open n pooled connections concurrently so first requests hit a hot pool"""
+        if settings.db_null_pool:
+            return
+        await asyncio.gather(*[self._ping() for _ in range(n)])
+        logger.info(f"Database pool warmed with {n} connections")
+
+    async def _ping(self) -> None:
+        """Check out a connection and run a trivial query"""
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    def pool_status(self) -> str:
+        """Current pool usage, e.g. for diagnostics"""
+        return self.engine.pool.status() if self.engine else "not connected"
+
     async def disconnect(self) -> None:
         """Close database engine"""
         if self.engine:
@@ -38,18 +79,24 @@ class Database:
             self.engine = None
             self.session_factory = None
 
-    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
-        """Get database session"""
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Open a database session; writers commit explicitly"""
         async with self.session_factory() as session:
             try:
                 yield session
-                await session.commit()
             except Exception:
                 await session.rollback()
                 raise
-            finally:
-                await session.close()
+            # Closing the session discards anything left uncommitted, so an
+            # early error return never persists a half-applied update
 
 
 # Global database instance
 db = Database()
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one session per request"""
+    async with db.session() as session:
+        yield session
@@ -1,52 +1,109 @@
-from fastapi import Request, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+import orjson
+from time import monotonic, time
+from fastapi import status
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.config import settings
+from src.models import User
 from src.services.auth import verify_token
 from src.utils import error_response
 
+# Verified tokens -> (expires_at, user); kept well below the token lifetime
+_TOKEN_CACHE_MAXSIZE = 10_000
+_token_cache: dict[str, tuple[float, User]] = {}
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """Authentication middleware for protected routes"""
+# Static 401 body for requests without a usable Authorization header
+_MISSING_AUTH_BODY = orjson.dumps(
+    error_response(message="Missing or invalid authorization header", code=401)
+)
 
-    # 不需要认证的 API 路径
-    EXCLUDED_API_PATHS = ["/api/auth/login"]
 
-    async def dispatch(self, request: Request, call_next):
-        # Skip authentication for OPTIONS requests (CORS preflight)
-        if request.method == "OPTIONS":
-            return await call_next(request)
+async def _authenticate(token: str) -> User:
+    """Verify a token, reusing a recent verification when available"""
+    now = monotonic()
+    cached = _token_cache.get(token)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    user, exp = await verify_token(token)
+    ttl = settings.token_cache_ttl
+    if exp is not None:
+        # Never trust the cached verification past the token's own expiry
+        ttl = min(ttl, exp - time())
+    if ttl > 0:
+        if len(_token_cache) >= _TOKEN_CACHE_MAXSIZE:
+            # Drop the oldest entry (dicts keep insertion order)
+            _token_cache.pop(next(iter(_token_cache)), None)
+        _token_cache[token] = (now + ttl, user)
+    return user
+
+
+class AuthMiddleware:
+    """Authentication middleware for the /api sub-application (pure ASGI)"""
+
+    # 不需要认证的 API 路径; the schema mirrors the public /openapi.json and
+    # /api/docs stays a plain 404 like /docs
+    EXCLUDED_API_PATHS: frozenset[str] = frozenset(
+        {"/api/auth/login", "/api/openapi.json", "/api/docs"}
+    )
 
-        # 只对 /api 开头的路径进行认证检查
-        if not request.url.path.startswith("/api"):
-            return await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        # 跳过不需要认证的 API 路径
-        if request.url.path in self.EXCLUDED_API_PATHS:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Skip authentication for OPTIONS requests (CORS preflight)
+        if scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        # 跳过不需要认证的 API 路径 (mounted apps keep the full path)
+        if scope["path"] in self.EXCLUDED_API_PATHS:
+            await self.app(scope, receive, send)
+            return
 
         # Get token from Authorization header
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content=error_response(
-                    message="Missing or invalid authorization header", code=401
-                ),
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        auth_header = Headers(scope=scope).get("Authorization")
+        if (
+            not auth_header
+            or len(auth_header) < 8
+            or not auth_header.startswith("Bearer ")
+        ):
+            await self._unauthorized(send, _MISSING_AUTH_BODY)
+            return
 
-        token = auth_header.split(" ")[1]
+        token = auth_header[7:]
 
         try:
-            user = await verify_token(token)
+            user = await _authenticate(token)
         except Exception as e:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content=error_response(message=str(e), code=401),
-                headers={"WWW-Authenticate": "Bearer"},
+            await self._unauthorized(
+                send, orjson.dumps(error_response(message=str(e), code=401))
             )
+            return
+
+        # Store user (and its primary key for session.get lookups) in request state
+        state = scope.setdefault("state", {})
+        state["user"] = user
+        state["user_id"] = user.id
 
-        # Store user in request state
-        request.state.user = user
+        await self.app(scope, receive, send)
 
-        return await call_next(request)
+    @staticmethod
+    async def _unauthorized(send: Send, body: bytes) -> None:
+        """Send a 401 JSON response directly over ASGI"""
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status.HTTP_401_UNAUTHORIZED,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"www-authenticate", b"Bearer"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Callable, Dict, Optional, List
 from datetime import datetime
+from functools import lru_cache
 from enum import Enum
 from croniter import croniter
+import copy
 
 
 class ExecutionStatus(str, Enum):
@@ -45,6 +47,44 @@ class Token(BaseModel):
     token_type: str
 
 
+_HTTP_SCHEMES = ("http://", "https://")
+
+# notify_type -> (display name, keys that must be present in config)
+_REQUIRED_KEYS: Dict[NotifyType, tuple] = {
+    NotifyType.WEBHOOK: ("Webhook", ("url",)),
+    NotifyType.TELEGRAM: ("Telegram", ("bot_token", "chat_id")),
+    NotifyType.DINGTALK: ("DingTalk", ("webhook_url", "secret")),
+}
+
+
+def _validate_webhook_config(v: dict) -> None:
+    if not isinstance(v["url"], str) or not v["url"].startswith(_HTTP_SCHEMES):
+        raise ValueError("Webhook 'url' must be a valid HTTP/HTTPS URL")
+
+
+def _validate_telegram_config(v: dict) -> None:
+    if not isinstance(v["bot_token"], str) or not v["bot_token"]:
+        raise ValueError("Telegram 'bot_token' must be a non-empty string")
+    if not isinstance(v["chat_id"], (str, int)) or not v["chat_id"]:
+        raise ValueError("Telegram 'chat_id' must be a non-empty string or integer")
+
+
+def _validate_dingtalk_config(v: dict) -> None:
+    if not isinstance(v["webhook_url"], str) or not v["webhook_url"].startswith(
+        _HTTP_SCHEMES
+    ):
+        raise ValueError("DingTalk 'webhook_url' must be a valid HTTP/HTTPS URL")
+    if not isinstance(v["secret"], str) or not v["secret"]:
+        raise ValueError("DingTalk 'secret' must be a non-empty string")
+
+
+_CONFIG_VALIDATORS: Dict[NotifyType, Callable[[dict], None]] = {
+    NotifyType.WEBHOOK: _validate_webhook_config,
+    NotifyType.TELEGRAM: _validate_telegram_config,
+    NotifyType.DINGTALK: _validate_dingtalk_config,
+}
+
+
 class NotificationSchema(BaseModel):
     notify_type: NotifyType
     config: dict
@@ -54,47 +94,22 @@ class NotificationSchema(BaseModel):
     def validate_config(cls, v: dict, info) -> dict:
         """Validate notification configuration parameters"""
         notify_type = info.data.get("notify_type")
+        validator = _CONFIG_VALIDATORS.get(notify_type)
+        if validator is None:
+            return v
 
-        if notify_type == NotifyType.WEBHOOK:
-            if "url" not in v:
-                raise ValueError("Webhook notification requires 'url' in config")
-            if not isinstance(v["url"], str) or not v["url"].startswith(
-                ("http://", "https://")
-            ):
-                raise ValueError("Webhook 'url' must be a valid HTTP/HTTPS URL")
-
-        elif notify_type == NotifyType.TELEGRAM:
-            if "bot_token" not in v:
-                raise ValueError("Telegram notification requires 'bot_token' in config")
-            if "chat_id" not in v:
-                raise ValueError("Telegram notification requires 'chat_id' in config")
-            if not isinstance(v["bot_token"], str) or not v["bot_token"]:
-                raise ValueError("Telegram 'bot_token' must be a non-empty string")
-            if not isinstance(v["chat_id"], (str, int)) or not v["chat_id"]:
-                raise ValueError(
-                    "Telegram 'chat_id' must be a non-empty string or integer"
-                )
-
-        elif notify_type == NotifyType.DINGTALK:
-            if "webhook_url" not in v:
-                raise ValueError(
-                    "DingTalk notification requires 'webhook_url' in config"
-                )
-            if "secret" not in v:
-                raise ValueError("DingTalk notification requires 'secret' in config")
-            if not isinstance(v["webhook_url"], str) or not v["webhook_url"].startswith(
-                ("http://", "https://")
-            ):
-                raise ValueError(
-                    "DingTalk 'webhook_url' must be a valid HTTP/HTTPS URL"
-                )
-            if not isinstance(v["secret"], str) or not v["secret"]:
-                raise ValueError("DingTalk 'secret' must be a non-empty string")
+        label, required_keys = _REQUIRED_KEYS[notify_type]
+        for key in required_keys:
+            if key not in v:
+                raise ValueError(f"{label} notification requires '{key}' in config")
 
+        validator(v)
         return v
 
 
 class NotificationResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     notify_type: NotifyType
     config: dict
@@ -102,6 +117,39 @@ class NotificationResponse(BaseModel):
     updated_at: datetime
 
 
+def _normalize_cron(expr: str) -> str:
+    """Collapse whitespace so equivalent expressions share cache entries"""
+    return " ".join(expr.split())
+
+
+@lru_cache(maxsize=2048)
+def _parse_cron(expr: str) -> croniter:
+    """Parse a normalized cron expression once; callers must not mutate it"""
+    return croniter(expr)
+
+
+@lru_cache(maxsize=2048)
+def _validate_cron(expr: str) -> bool:
+    """Validate a normalized cron expression; only valid expressions are cached"""
+    if len(expr.split()) != 5:
+        raise ValueError(
+            "Cron expression must have 5 fields: minute hour day month weekday"
+        )
+    try:
+        # Use croniter to validate expression validity
+        _parse_cron(expr)
+    except (ValueError, KeyError) as e:
+        raise ValueError(f"Invalid cron expression: {str(e)}")
+    return True
+
+
+def get_cached_croniter(expr: str, start_time: datetime) -> croniter:
+    """Get a croniter positioned at start_time, reusing the cached parse of expr"""
+    cron = copy.copy(_parse_cron(_normalize_cron(expr)))
+    cron.set_current(start_time, force=True)
+    return cron
+
+
 class TaskSchema(BaseModel):
     name: str
     description: Optional[str] = None
@@ -121,20 +169,19 @@ class TaskSchema(BaseModel):
     @classmethod
     def validate_cron_expression(cls, v: str) -> str:
         """Validate cron expression, supports standard 5-field format (minute hour day month weekday)"""
-        parts = v.strip().split()
-        if len(parts) != 5:
-            raise ValueError(
-                "Cron expression must have 5 fields: minute hour day month weekday"
-            )
-        try:
-            # Use croniter to validate expression validity
-            croniter(v)
-        except (ValueError, KeyError) as e:
-            raise ValueError(f"Invalid cron expression: {str(e)}")
+        _validate_cron(_normalize_cron(v))
         return v
 
+    @field_validator("notification_ids")
+    @classmethod
+    def dedupe_notification_ids(cls, v: Optional[List[int]]) -> Optional[List[int]]:
+        """Drop repeated ids (keeping order) so the existence COUNT can match"""
+        return list(dict.fromkeys(v)) if v else v
+
 
 class TaskResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     name: str
     description: Optional[str]
@@ -152,6 +199,8 @@ class TaskResponse(BaseModel):
 
 
 class TaskExecutionResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     task_id: int
     started_at: datetime
@@ -164,6 +213,8 @@ class TaskExecutionResponse(BaseModel):
 
 
 class TaskExecutionDetailResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     task_id: int
     task: Optional[TaskResponse]
@@ -255,6 +306,8 @@ class DependencySchema(BaseModel):
 
 
 class DependencyResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     dependency_type: str
     package_name: str
@@ -8,9 +8,10 @@ from sqlalchemy import (
     Index,
     TIMESTAMP,
     ARRAY,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
 
 TABLE_PREFIX = "cm_"
@@ -65,6 +66,8 @@ class Notification(Base):
     )
 
     __table_args__ = (Index(f"idx_{TABLE_PREFIX}notifications_type", "notify_type"),)
+    # Fetch server-generated timestamps via INSERT/UPDATE ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class Task(Base):
@@ -79,7 +82,9 @@ class Task(Base):
         comment="Cron expression (5-field format: minute hour day month weekday)",
     )
     command = Column(Text, nullable=False, comment="Command to execute")
-    is_active = Column(Boolean, default=True, comment="Whether task is active")
+    is_active = Column(
+        Boolean, server_default=text("true"), comment="Whether task is active"
+    )
     timeout = Column(
         Integer,
         default=300,
@@ -123,7 +128,16 @@ class Task(Base):
         comment="Last update timestamp",
     )
 
-    __table_args__ = (Index(f"idx_{TABLE_PREFIX}tasks_is_active", "is_active"),)
+    __table_args__ = (
+        # Partial index: the scheduler only ever scans active tasks
+        Index(
+            f"idx_{TABLE_PREFIX}tasks_active_next_run",
+            "next_run_time",
+            postgresql_where=text("is_active = true"),
+        ),
+    )
+    # created_at/updated_at/is_active come back with the write itself
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class TaskExecution(Base):
@@ -159,13 +173,31 @@ class TaskExecution(Base):
         comment="Execution duration in seconds",
     )
 
+    # Load explicitly (join/selectinload); implicit lazy loads raise
+    task = relationship("Task", lazy="raise")
+
     __table_args__ = (
-        Index(f"idx_{TABLE_PREFIX}task_executions_task_id", "task_id"),
+        # Serves "WHERE task_id = ? ORDER BY started_at DESC" (and task_id lookups)
         Index(
-            f"idx_{TABLE_PREFIX}task_executions_started_at",
+            f"idx_{TABLE_PREFIX}task_executions_task_started",
+            "task_id",
             "started_at",
             postgresql_ops={"started_at": "DESC"},
         ),
+        # Newest-first listing and its (started_at, id) keyset cursor. create_all
+        # skips existing tables entirely; see the README upgrade SQL
+        Index(
+            f"idx_{TABLE_PREFIX}task_executions_started_id",
+            "started_at",
+            "id",
+            postgresql_ops={"started_at": "DESC", "id": "DESC"},
+        ),
+        # Partial index for the scheduler's running-execution lookups
+        Index(
+            f"idx_{TABLE_PREFIX}task_executions_running",
+            "started_at",
+            postgresql_where=text("status = 'running'"),
+        ),
     )
 
 
@@ -215,4 +247,11 @@ class Dependency(Base):
             "package_name",
             unique=True,
         ),
+        # Newest-first listing and its (created_at, id) keyset cursor
+        Index(
+            f"idx_{TABLE_PREFIX}dependencies_created_at",
+            "created_at",
+            "id",
+            postgresql_ops={"created_at": "DESC", "id": "DESC"},
+        ),
     )
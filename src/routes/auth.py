@@ -1,6 +1,8 @@
-from fastapi import APIRouter
+import asyncio
+from fastapi import APIRouter, Depends
 from datetime import timedelta
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.models import UserSchema, UserLoginSchema, Token, User
 from src.services import (
     get_password_hash,
@@ -8,52 +10,65 @@ from src.services import (
     create_access_token,
     verify_totp,
 )
-from src.databases import db
+from src.databases import get_session
 from src.config import settings
 from src.utils import success_response, error_response
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Settings are loaded once at startup, so the token lifetime is fixed
+_ACCESS_TOKEN_TTL = timedelta(hours=settings.access_token_expire_hours)
+
+# Only the columns login needs, as a plain row (no ORM instance)
+_LOGIN_STMT = select(
+    User.id,
+    User.username,
+    User.password,
+    User.is_2fa_enabled,
+    User.totp_secret_key,
+).where(User.username == bindparam("username"))
+
 
 @router.post("/login")
-async def login(user_data: UserLoginSchema) -> dict:
+async def login(
+    user_data: UserLoginSchema, session: AsyncSession = Depends(get_session)
+) -> dict:
     # Validate required login fields
     if not user_data.username or not user_data.password:
         return error_response(message="Username and password are required", code=400)
 
-    async for session in db.get_session():
-        result = await session.execute(
-            select(User).where(User.username == user_data.username)
-        )
-        user = result.scalar_one_or_none()
-        if not user or not verify_password(user_data.password, user.password):
-            return error_response(message="Incorrect username or password", code=401)
-
-        # Check if 2FA is enabled
-        if user.is_2fa_enabled:
-            if not user_data.totp_code:
-                return error_response(message="2FA verification required", code=403)
-            if not user.totp_secret_key or not verify_totp(
-                user.totp_secret_key, user_data.totp_code
-            ):
-                return error_response(message="Invalid 2FA code", code=401)
-
-        access_token_expires = timedelta(hours=settings.access_token_expire_hours)
-        access_token = create_access_token(
-            data={"sub": user.username}, expires_delta=access_token_expires
-        )
-
-        user_response_data = {
-            "id": user.id,
-            "username": user.username,
-            "is_2fa_enabled": user.is_2fa_enabled,
-        }
-
-        return success_response(
-            data={
-                "access_token": access_token,
-                "token_type": "bearer",
-                "user_data": user_response_data,
-            },
-            message="Login successful",
-        )
+    result = await session.execute(_LOGIN_STMT, {"username": user_data.username})
+    user = result.first()
+    # bcrypt is CPU-bound; check in a worker thread so the event loop keeps serving
+    if not user or not await asyncio.to_thread(
+        verify_password, user_data.password, user.password
+    ):
+        return error_response(message="Incorrect username or password", code=401)
+
+    # Check if 2FA is enabled
+    if user.is_2fa_enabled:
+        if not user_data.totp_code:
+            return error_response(message="2FA verification required", code=403)
+        if not user.totp_secret_key or not verify_totp(
+            user.totp_secret_key, user_data.totp_code
+        ):
+            return error_response(message="Invalid 2FA code", code=401)
+
+    access_token = create_access_token(
+        data={"sub": user.username}, expires_delta=_ACCESS_TOKEN_TTL
+    )
+
+    user_response_data = {
+        "id": user.id,
+        "username": user.username,
+        "is_2fa_enabled": user.is_2fa_enabled,
+    }
+
+    return success_response(
+        data={
+            "access_token": access_token,
+            "token_type": "bearer",
+            "user_data": user_response_data,
+        },
+        message="Login successful",
+    )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Request, Query
 from typing import Optional
-from src.utils import success_response, error_response
+from datetime import datetime
+from src.utils import success_response, success_json_response, error_response
 from src.services.dependencies import dependency_service
 from src.models.schemas import DependencySchema
 
@@ -19,12 +20,18 @@ async def list_dependencies(
     status: Optional[str] = Query(
         None, description="Filter by status: pending, installing, installed, failed"
     ),
+    before_created_at: Optional[datetime] = Query(
+        None, description="Keyset cursor: created_at of the last item seen"
+    ),
+    before_id: Optional[int] = Query(
+        None, description="Keyset cursor: id of the last item seen"
+    ),
 ):
     """List all dependencies with pagination"""
     result = await dependency_service.list_dependencies(
-        dependency_type, status, page, page_size
+        dependency_type, status, page, page_size, before_created_at, before_id
     )
-    return success_response(data=result)
+    return success_json_response(data=result)
 
 
 @router.post("")
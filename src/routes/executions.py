@@ -1,183 +1,338 @@
-from fastapi import APIRouter, Depends, Request, Query
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
 from typing import List, Optional
-from sqlalchemy import select, func
+from datetime import datetime
+from sqlalchemy import (
+    select,
+    bindparam,
+    func,
+    tuple_,
+    case,
+    cast,
+    literal_column,
+    null,
+    Text,
+    TIMESTAMP,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from src.models import (
     TaskExecutionResponse,
     TaskExecutionDetailResponse,
     TaskExecution,
     Task,
     ExecutionStatus,
-    NotificationResponse,
-    Notification,
     NotifyType,
     TaskResponse,
 )
-from src.databases import db
-from src.utils import success_response, error_response
+from src.databases import get_session
+from src.utils import success_json_response, error_response
 
 router = APIRouter(prefix="/executions", tags=["executions"])
 
 
+def _construct_task_response(task: Task) -> TaskResponse:
+    """Build TaskResponse from a trusted DB row without re-validating it"""
+    return TaskResponse.model_construct(
+        **{field: getattr(task, field) for field in TaskResponse.model_fields}
+    )
+
+
+# Columns needed by the list view (output/error are omitted there)
+_LIST_COLUMNS = (
+    TaskExecution.id,
+    TaskExecution.task_id,
+    TaskExecution.started_at,
+    TaskExecution.finished_at,
+    TaskExecution.status,
+    TaskExecution.retry_attempt,
+    TaskExecution.duration,
+)
+
+
+# Page query without filters/paging; handlers only add WHERE/OFFSET/LIMIT
+_LIST_PAGE_STMT = (
+    select(*_LIST_COLUMNS, Task, func.count().over().label("total"))
+    .outerjoin(Task, Task.id == TaskExecution.task_id)
+    .order_by(TaskExecution.started_at.desc(), TaskExecution.id.desc())
+)
+
+# Keyset pages: no count(*) OVER (), which would read every row past the
+# cursor and stop LIMIT from ending the index scan early
+_KEYSET_PAGE_STMT = (
+    select(*_LIST_COLUMNS, Task)
+    .outerjoin(Task, Task.id == TaskExecution.task_id)
+    .order_by(TaskExecution.started_at.desc(), TaskExecution.id.desc())
+)
+
+# Built once; only the bound execution_id changes per request
+_GET_EXECUTION_STMT = (
+    select(TaskExecution)
+    .options(joinedload(TaskExecution.task))
+    .where(TaskExecution.id == bindparam("execution_id"))
+)
+
+
+def _json_object(**columns):
+    """json_build_object(key, value, ...) from keyword arguments"""
+    args = []
+    for key, value in columns.items():
+        args.extend((key, value))
+    return func.json_build_object(*args)
+
+
+def _utc_iso(column):
+    """ISO-8601 text matching orjson's OPT_UTC_Z output for a timestamptz"""
+    utc = func.timezone("UTC", column)
+    micros = func.to_char(utc, "US", type_=Text)
+    return (
+        func.to_char(utc, 'YYYY-MM-DD"T"HH24:MI:SS', type_=Text)
+        + case((micros == "000000", ""), else_="." + micros)
+        + "Z"
+    )
+
+
+def _json_column(column):
+    """Column value for json_build_object, with timestamps rendered by _utc_iso"""
+    return _utc_iso(column) if isinstance(column.type, TIMESTAMP) else column
+
+
+async def _list_executions_json(
+    session: AsyncSession,
+    filters: list,
+    page: int,
+    page_size: int,
+    before: Optional[tuple[datetime, int]] = None,
+) -> str:
+    """Build the list_executions response body as JSON text inside PostgreSQL"""
+    # Same ordering and keyset/offset paging as _LIST_PAGE_STMT
+    page_stmt = (
+        select(*_LIST_COLUMNS)
+        .where(*filters)
+        .order_by(TaskExecution.started_at.desc(), TaskExecution.id.desc())
+    )
+    if before is not None:
+        page_stmt = page_stmt.where(
+            tuple_(TaskExecution.started_at, TaskExecution.id) < tuple_(*before)
+        )
+    else:
+        page_stmt = page_stmt.offset((page - 1) * page_size)
+    # CTE: referenced by the items, the row count and the cursor
+    page_rows = page_stmt.limit(page_size).cte("e")
+
+    task_json = case(
+        (Task.id.is_(None), null()),
+        else_=_json_object(
+            **{
+                field: _json_column(getattr(Task, field))
+                for field in TaskResponse.model_fields
+            }
+        ),
+    )
+    item_json = _json_object(
+        id=page_rows.c.id,
+        task_id=page_rows.c.task_id,
+        task=task_json,
+        started_at=_utc_iso(page_rows.c.started_at),
+        finished_at=_utc_iso(page_rows.c.finished_at),
+        status=page_rows.c.status,
+        output=null(),  # Don't include output in list view
+        error=null(),  # Don't include error in list view
+        retry_attempt=page_rows.c.retry_attempt,
+        duration=page_rows.c.duration,
+    )
+    items = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        item_json, page_rows.c.started_at.desc(), page_rows.c.id.desc()
+                    )
+                ),
+                literal_column("'[]'::json"),
+            )
+        )
+        .select_from(page_rows.outerjoin(Task, Task.id == page_rows.c.task_id))
+        .scalar_subquery()
+    )
+    # Cursor from the last (oldest) row, only when the page is full
+    last_row = (
+        select(
+            _json_object(
+                before_started_at=_utc_iso(page_rows.c.started_at),
+                before_id=page_rows.c.id,
+            )
+        )
+        .order_by(page_rows.c.started_at.asc(), page_rows.c.id.asc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    page_count = select(func.count()).select_from(page_rows).scalar_subquery()
+    next_cursor = case((page_count == page_size, last_row), else_=null())
+
+    if before is not None:
+        # Cursor mode skips the full COUNT, like the model path
+        total = total_pages = null()
+        from_clause = None
+    else:
+        counts = (
+            select(func.count(TaskExecution.id).label("total"))
+            .where(*filters)
+            .subquery("c")
+        )
+        total = counts.c.total
+        total_pages = (counts.c.total + page_size - 1) // page_size
+        from_clause = counts
+
+    body = _json_object(
+        code=200,
+        message="Success",
+        data=_json_object(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            next_cursor=next_cursor,
+        ),
+    )
+
+    # Cast to text so the JSON codec does not decode it back into Python
+    stmt = select(cast(body, Text))
+    if from_clause is not None:
+        stmt = stmt.select_from(from_clause)
+    result = await session.execute(stmt)
+    return result.scalar_one()
+
+
 @router.get("")
 async def list_executions(
-    request: Request,
+    session: AsyncSession = Depends(get_session),
     task_id: Optional[int] = Query(None, description="Filter by task ID"),
     status: Optional[ExecutionStatus] = Query(None, description="Filter by status"),
     page: int = Query(1, ge=1, description="Page number (starting from 1)"),
     page_size: int = Query(20, ge=1, le=200, description="Items per page"),
+    raw: bool = Query(
+        False, description="Build the JSON payload in the database (skips models)"
+    ),
+    before_started_at: Optional[datetime] = Query(
+        None, description="Keyset cursor: started_at of the last item seen"
+    ),
+    before_id: Optional[int] = Query(
+        None, description="Keyset cursor: id of the last item seen"
+    ),
 ) -> dict:
     """Get task execution history with multi-condition filtering and pagination support"""
-    async for session in db.get_session():
-        # Build query
-        query = select(TaskExecution)
-
-        # Apply filter conditions
-        if task_id is not None:
-            query = query.where(TaskExecution.task_id == task_id)
+    # Build filter conditions
+    filters = []
+    if task_id is not None:
+        filters.append(TaskExecution.task_id == task_id)
 
-        if status is not None:
-            query = query.where(TaskExecution.status == status.value)
+    if status is not None:
+        filters.append(TaskExecution.status == status.value)
 
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await session.execute(count_query)
-        total = total_result.scalar()
+    offset = (page - 1) * page_size
+    # Keyset mode seeks past the cursor instead of scanning OFFSET rows
+    keyset = before_started_at is not None and before_id is not None
 
-        # Calculate pagination
-        offset = (page - 1) * page_size
-        total_pages = (total + page_size - 1) // page_size
+    if raw:
+        body = await _list_executions_json(
+            session,
+            filters,
+            page,
+            page_size,
+            (before_started_at, before_id) if keyset else None,
+        )
+        return Response(content=body, media_type="application/json")
 
-        # Sort and paginate
-        query = (
-            query.order_by(TaskExecution.started_at.desc())
-            .offset(offset)
-            .limit(page_size)
+    if keyset:
+        # Seek past the cursor; no total is computed in cursor mode
+        stmt = _KEYSET_PAGE_STMT.where(
+            *filters,
+            tuple_(TaskExecution.started_at, TaskExecution.id)
+            < tuple_(before_started_at, before_id),
         )
+        result = await session.execute(stmt.limit(page_size))
+        rows = result.all()
+        total = total_pages = None
+    else:
+        # Fetch the page, its tasks and the total count in one query via
+        # count(*) OVER (); plain execution columns skip ORM hydration
+        stmt = _LIST_PAGE_STMT.where(*filters).offset(offset)
+        result = await session.execute(stmt.limit(page_size))
+        rows = result.all()
 
-        result = await session.execute(query)
-        executions = result.scalars().all()
-
-        # Get all unique task IDs
-        task_ids = list(set(e.task_id for e in executions))
-
-        # Fetch all related tasks in one query
-        tasks_result = await session.execute(select(Task).where(Task.id.in_(task_ids)))
-        tasks = {task.id: task for task in tasks_result.scalars().all()}
-
-        # Build response with task information
-        items = []
-        for e in executions:
-            task = tasks.get(e.task_id)
-            task_response = None
-            if task:
-                task_response = TaskResponse(
-                    id=task.id,
-                    name=task.name,
-                    description=task.description,
-                    cron_expression=task.cron_expression,
-                    command=task.command,
-                    is_active=task.is_active,
-                    timeout=task.timeout,
-                    retry_count=task.retry_count,
-                    retry_interval=task.retry_interval,
-                    notify_strategy=task.notify_strategy,
-                    next_run_time=task.next_run_time,
-                    created_at=task.created_at,
-                    updated_at=task.updated_at,
-                )
-
-            items.append(
-                TaskExecutionDetailResponse(
-                    id=e.id,
-                    task_id=e.task_id,
-                    task=task_response,
-                    started_at=e.started_at,
-                    finished_at=e.finished_at,
-                    status=e.status,
-                    output=None,  # Don't include output in list view
-                    error=None,  # Don't include error in list view
-                    retry_attempt=e.retry_attempt,
-                    duration=e.duration,
-                )
+        if rows:
+            total = rows[0].total
+        elif offset:
+            # Past the last page the window cannot give the total for the filter
+            total_result = await session.execute(
+                select(func.count(TaskExecution.id)).where(*filters)
             )
+            total = total_result.scalar()
+        else:
+            total = 0
+        total_pages = (total + page_size - 1) // page_size
 
-        return success_response(
-            data={
-                "items": items,
-                "total": total,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": total_pages,
+    # Build response with task information
+    items = []
+    for row in rows:
+        task = row.Task
+        items.append(
+            {
+                "id": row.id,
+                "task_id": row.task_id,
+                "task": _construct_task_response(task) if task else None,
+                "started_at": row.started_at,
+                "finished_at": row.finished_at,
+                "status": row.status,
+                "output": None,  # Don't include output in list view
+                "error": None,  # Don't include error in list view
+                "retry_attempt": row.retry_attempt,
+                "duration": row.duration,
             }
         )
 
+    return success_json_response(
+        data={
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "next_cursor": (
+                {"before_started_at": rows[-1].started_at, "before_id": rows[-1].id}
+                if len(rows) == page_size
+                else None
+            ),
+        }
+    )
+
 
 @router.get("/{execution_id}")
-async def get_execution(execution_id: int, request: Request) -> dict:
+async def get_execution(
+    execution_id: int, session: AsyncSession = Depends(get_session)
+) -> dict:
     """Get single execution record details (including associated task information)"""
-    async for session in db.get_session():
-        result = await session.execute(
-            select(TaskExecution).where(TaskExecution.id == execution_id)
-        )
-        execution = result.scalar_one_or_none()
-        if not execution:
-            return error_response(message="Execution not found", code=404)
+    # Load the execution and its task in one round trip
+    result = await session.execute(_GET_EXECUTION_STMT, {"execution_id": execution_id})
+    execution = result.scalar_one_or_none()
+    if not execution:
+        return error_response(message="Execution not found", code=404)
+    task = execution.task
 
-        # Get associated task information
-        task_result = await session.execute(
-            select(Task).where(Task.id == execution.task_id)
-        )
-        task = task_result.scalar_one_or_none()
-
-        task_response = None
-        if task:
-            # Fetch notifications if task has notification_ids
-            notifications = []
-            if task.notification_ids:
-                notifications_result = await session.execute(
-                    select(Notification).where(
-                        Notification.id.in_(task.notification_ids)
-                    )
-                )
-                notifications = [
-                    NotificationResponse(
-                        id=n.id,
-                        notify_type=n.notify_type,
-                        config=n.config,
-                        created_at=n.created_at,
-                        updated_at=n.updated_at,
-                    )
-                    for n in notifications_result.scalars().all()
-                ]
-
-            task_response = TaskResponse(
-                id=task.id,
-                name=task.name,
-                description=task.description,
-                cron_expression=task.cron_expression,
-                command=task.command,
-                is_active=task.is_active,
-                timeout=task.timeout,
-                retry_count=task.retry_count,
-                retry_interval=task.retry_interval,
-                notifications=notifications if notifications else None,
-                notify_strategy=task.notify_strategy,
-                next_run_time=task.next_run_time,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-            )
-
-        execution_detail = TaskExecutionDetailResponse(
-            id=execution.id,
-            task_id=execution.task_id,
-            task=task_response,
-            started_at=execution.started_at,
-            finished_at=execution.finished_at,
-            status=execution.status,
-            output=execution.output,
-            error=execution.error,
-            retry_attempt=execution.retry_attempt,
-            duration=execution.duration,
-        )
+    execution_detail = TaskExecutionDetailResponse.model_construct(
+        id=execution.id,
+        task_id=execution.task_id,
+        task=_construct_task_response(task) if task else None,
+        started_at=execution.started_at,
+        finished_at=execution.finished_at,
+        status=execution.status,
+        output=execution.output,
+        error=execution.error,
+        retry_attempt=execution.retry_attempt,
+        duration=execution.duration,
+    )
 
-        return success_response(data=execution_detail)
+    return success_json_response(data=execution_detail)
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Request
-from src.utils import success_response, error_response
+import asyncio
+from fastapi import APIRouter, Query
+from fastapi.responses import FileResponse
+from src.utils import success_response, success_json_response, error_response
 from src.services.scripts import script_service
 from src.models.schemas import (
     ScriptSchema,
@@ -16,16 +18,36 @@ router = APIRouter(prefix="/scripts", tags=["scripts"])
 
 
 @router.get("")
-async def list_scripts(request: Request) -> dict:
+async def list_scripts() -> dict:
     """List all scripts in tree structure"""
-    tree = script_service.list_scripts()
-    return success_response(data=tree)
+    tree = await asyncio.to_thread(script_service.list_scripts)
+    # The tree is plain dicts/strings; let orjson encode it directly
+    return success_json_response(data=tree)
 
 
 @router.get("/{script_path:path}")
-async def get_script(script_path: str, request: Request):
+async def get_script(
+    script_path: str,
+    raw: bool = Query(False, description="Return the file content as plain text"),
+):
     """Get a specific script by path, supports folder paths like 'folder/script.py'"""
-    success, error_msg, script_data = script_service.get_script(script_path)
+    if raw:
+        success, error_msg, full_path = await asyncio.to_thread(
+            script_service.get_script_file, script_path
+        )
+        if not success:
+            code = 404 if "not found" in error_msg else 400
+            return error_response(message=error_msg, code=code)
+
+        return FileResponse(
+            full_path,
+            media_type="text/plain; charset=utf-8",
+            headers={"X-Script-Type": script_service.get_script_type(full_path.name)},
+        )
+
+    success, error_msg, script_data = await asyncio.to_thread(
+        script_service.get_script, script_path
+    )
 
     if not success:
         code = 404 if "not found" in error_msg else 400
@@ -35,24 +57,32 @@ async def get_script(script_path: str, request: Request):
 
 
 @router.post("")
-async def create_script(script_data: ScriptSchema, request: Request):
+async def create_script(script_data: ScriptSchema):
     """Create a new script, supports folder paths like 'folder/script.py'"""
-    success, error_msg, script_response = script_service.create_script(
-        script_data.name, script_data.content
+    success, error_msg, script_response = await asyncio.to_thread(
+        script_service.create_script, script_data.name, script_data.content
     )
 
     if not success:
-        code = 409 if "already exists" in error_msg else 400
+        if "already exists" in error_msg:
+            code = 409
+        elif "Access denied" in error_msg:
+            code = 403
+        else:
+            code = 400
         return error_response(message=error_msg, code=code)
 
     return success_response(data=script_response, message="Script created successfully")
 
 
 @router.put("/{script_path:path}")
-async def update_script(script_path: str, script_data: ScriptSchema, request: Request):
+async def update_script(script_path: str, script_data: ScriptSchema):
     """Update an existing script, supports folder paths like 'folder/script.py'"""
-    success, error_msg, script_response = script_service.update_script(
-        script_path, script_data.name, script_data.content
+    success, error_msg, script_response = await asyncio.to_thread(
+        script_service.update_script,
+        script_path,
+        script_data.name,
+        script_data.content,
     )
 
     if not success:
@@ -70,9 +100,11 @@ async def update_script(script_path: str, script_data: ScriptSchema, request: Re
 
 
 @router.delete("/{script_path:path}")
-async def delete_script(script_path: str, request: Request):
+async def delete_script(script_path: str):
     """Delete a script, supports folder paths like 'folder/script.py'"""
-    success, error_msg = script_service.delete_script(script_path)
+    success, error_msg = await asyncio.to_thread(
+        script_service.delete_script, script_path
+    )
 
     if not success:
         if "not found" in error_msg:
@@ -87,9 +119,7 @@ async def delete_script(script_path: str, request: Request):
 
 
 @router.post("/{script_path:path}/run")
-async def run_script(
-    script_path: str, execution_request: ScriptExecutionRequest, request: Request
-):
+async def run_script(script_path: str, execution_request: ScriptExecutionRequest):
     """Run a script with optional arguments"""
     result = await script_service.run_script(
         script_path, execution_request.args, execution_request.timeout
@@ -110,7 +140,7 @@ async def run_script(
 
 
 @router.post("/git/clone")
-async def clone_git_repo(clone_request: GitCloneRequest, request: Request):
+async def clone_git_repo(clone_request: GitCloneRequest):
     """Clone a git repository into the scripts directory"""
     result = await script_service.clone_git_repo(
         clone_request.repo_url, clone_request.target_dir, clone_request.branch
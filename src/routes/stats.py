@@ -1,79 +1,90 @@
-from fastapi import APIRouter, Request
-from sqlalchemy import select, func
+from time import monotonic
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import select, func, true
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.utils import success_response, error_response
 from src.models.schemas import TaskStatsResponse
 from src.models.tables import Task, TaskExecution
-from src.databases import db
+from src.databases import get_session
 
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
+# Dashboards poll the summary; serve it from memory for a few seconds
+_STATS_CACHE_TTL = 5.0
+_stats_cache: tuple[float, TaskStatsResponse] | None = None
 
-@router.get("/tasks/summary")
-async def get_tasks_stats(request: Request):
-    """Get statistics about all tasks and executions"""
-    try:
-        async for session in db.get_session():
-            # Get total tasks count
-            total_tasks_result = await session.execute(select(func.count(Task.id)))
-            total_tasks = total_tasks_result.scalar() or 0
-
-            # Get active tasks count
-            active_tasks_result = await session.execute(
-                select(func.count(Task.id)).where(Task.is_active == True)
-            )
-            active_tasks = active_tasks_result.scalar() or 0
+# Conditional aggregates (COUNT ... FILTER) so each table is scanned once
+_TASK_COUNTS = select(
+    func.count(Task.id).label("total_tasks"),
+    func.count(Task.id).filter(Task.is_active == True).label("active_tasks"),
+).subquery("task_counts")
 
-            # Get inactive tasks count
-            inactive_tasks = total_tasks - active_tasks
+_EXECUTION_COUNTS = select(
+    func.count(TaskExecution.id).label("total_executions"),
+    func.count(TaskExecution.id)
+    .filter(TaskExecution.status == "success")
+    .label("success_executions"),
+    func.count(TaskExecution.id)
+    .filter(TaskExecution.status == "failed")
+    .label("failed_executions"),
+    func.count(TaskExecution.id)
+    .filter(TaskExecution.status == "running")
+    .label("running_executions"),
+).subquery("execution_counts")
 
-            # Get total executions count
-            total_executions_result = await session.execute(
-                select(func.count(TaskExecution.id))
-            )
-            total_executions = total_executions_result.scalar() or 0
+# Both sides are single-row aggregates; join them explicitly ON true so the
+# statement is not flagged as an accidental cartesian product
+_STATS_STMT = select(
+    _TASK_COUNTS.c.total_tasks,
+    _TASK_COUNTS.c.active_tasks,
+    _EXECUTION_COUNTS.c.total_executions,
+    _EXECUTION_COUNTS.c.success_executions,
+    _EXECUTION_COUNTS.c.failed_executions,
+    _EXECUTION_COUNTS.c.running_executions,
+).select_from(_TASK_COUNTS.join(_EXECUTION_COUNTS, true()))
 
-            # Get success executions count
-            success_executions_result = await session.execute(
-                select(func.count(TaskExecution.id)).where(
-                    TaskExecution.status == "success"
-                )
-            )
-            success_executions = success_executions_result.scalar() or 0
 
-            # Get failed executions count
-            failed_executions_result = await session.execute(
-                select(func.count(TaskExecution.id)).where(
-                    TaskExecution.status == "failed"
-                )
-            )
-            failed_executions = failed_executions_result.scalar() or 0
+@router.get("/tasks/summary")
+async def get_tasks_stats(
+    request: Request, session: AsyncSession = Depends(get_session)
+):
+    """Get statistics about all tasks and executions"""
+    global _stats_cache
+    now = monotonic()
+    if _stats_cache is not None and _stats_cache[0] > now:
+        return success_response(data=_stats_cache[1])
 
-            # Get running executions count
-            running_executions_result = await session.execute(
-                select(func.count(TaskExecution.id)).where(
-                    TaskExecution.status == "running"
-                )
-            )
-            running_executions = running_executions_result.scalar() or 0
+    try:
+        # All counts in one round trip: one aggregate pass per table
+        result = await session.execute(_STATS_STMT)
+        counts = result.one()
+        total_tasks = counts.total_tasks
+        active_tasks = counts.active_tasks
+        inactive_tasks = total_tasks - active_tasks
+        total_executions = counts.total_executions
+        success_executions = counts.success_executions
+        failed_executions = counts.failed_executions
+        running_executions = counts.running_executions
 
-            # Calculate success rate
-            success_rate = None
-            if total_executions > 0:
-                success_rate = round((success_executions / total_executions) * 100, 2)
+        # Calculate success rate
+        success_rate = None
+        if total_executions > 0:
+            success_rate = round((success_executions / total_executions) * 100, 2)
 
-            stats = TaskStatsResponse(
-                total_tasks=total_tasks,
-                active_tasks=active_tasks,
-                inactive_tasks=inactive_tasks,
-                total_executions=total_executions,
-                success_executions=success_executions,
-                failed_executions=failed_executions,
-                running_executions=running_executions,
-                success_rate=success_rate,
-            )
+        stats = TaskStatsResponse(
+            total_tasks=total_tasks,
+            active_tasks=active_tasks,
+            inactive_tasks=inactive_tasks,
+            total_executions=total_executions,
+            success_executions=success_executions,
+            failed_executions=failed_executions,
+            running_executions=running_executions,
+            success_rate=success_rate,
+        )
 
-            return success_response(data=stats)
+        _stats_cache = (now + _STATS_CACHE_TTL, stats)
+        return success_response(data=stats)
 
     except Exception as e:
         return error_response(message=str(e), code=500)
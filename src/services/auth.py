@@ -1,5 +1,9 @@
+import asyncio
 import jwt
 import bcrypt
+import hashlib
+import hmac
+import time
 import secrets
 import string
 import pyotp
@@ -13,11 +17,33 @@ from src.models import User
 from src.utils import logger
 
 
+# Recent successful bcrypt checks: sha256(password) + hash -> expires_at.
+# Failures are never cached so the cache cannot be used as an oracle.
+_PASSWORD_CACHE_TTL = 60
+_PASSWORD_CACHE_MAXSIZE = 2048
+_verified_passwords: dict[bytes, float] = {}
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    return bcrypt.checkpw(
-        plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+    key = (
+        hashlib.sha256(plain_password.encode("utf-8")).digest()
+        + hashed_password.encode("utf-8")
     )
+    now = time.monotonic()
+    expires_at = _verified_passwords.get(key)
+    if expires_at is not None and expires_at > now:
+        return True
+
+    if not bcrypt.checkpw(
+        plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+    ):
+        return False
+
+    if len(_verified_passwords) >= _PASSWORD_CACHE_MAXSIZE:
+        _verified_passwords.pop(next(iter(_verified_passwords)), None)
+    _verified_passwords[key] = now + _PASSWORD_CACHE_TTL
+    return True
 
 
 def get_password_hash(password: str) -> str:
@@ -39,8 +65,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def verify_token(token: str) -> User:
-    """Verify JWT token and return user"""
+async def verify_token(token: str) -> tuple[User, Optional[float]]:
+    """Verify JWT token and return the user and the token's exp (epoch seconds)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -53,17 +79,17 @@ async def verify_token(token: str) -> User:
     except jwt.InvalidTokenError:
         raise credentials_exception
 
-    async for session in db.get_session():
+    async with db.session() as session:
         result = await session.execute(select(User).where(User.username == username))
         user = result.scalar_one_or_none()
         if user is None:
             raise credentials_exception
-        return user
+        return user, payload.get("exp")
 
 
 async def initialize_admin_user():
     """Initialize admin user with random password if not exists"""
-    async for session in db.get_session():
+    async with db.session() as session:
         result = await session.execute(select(User).where(User.username == "admin"))
         admin_user = result.scalar_one_or_none()
 
@@ -73,7 +99,9 @@ async def initialize_admin_user():
             random_password = "".join(secrets.choice(alphabet) for _ in range(16))
 
             # Create admin user
-            hashed_password = get_password_hash(random_password)
+            hashed_password = await asyncio.to_thread(
+                get_password_hash, random_password
+            )
             admin_user = User(username="admin", password=hashed_password)
             session.add(admin_user)
             await session.commit()
@@ -86,11 +114,22 @@ async def initialize_admin_user():
             logger.warning("=" * 60)
 
 
+# Clock-drift tolerance for TOTP codes: previous, current and next step
+_TOTP_WINDOW = (-1, 0, 1)
+
+
 def verify_totp(secret: str, code: str) -> bool:
     """Verify TOTP code against secret"""
     try:
         totp = pyotp.TOTP(secret)
-        return totp.verify(code, valid_window=1)
+        candidate = str(code).encode()
+        now = time.time()
+        # Check every step in the ±1 window without stopping at the first
+        # match, so timing does not reveal which step (if any) matched
+        matched = False
+        for offset in _TOTP_WINDOW:
+            matched |= hmac.compare_digest(totp.at(now, offset).encode(), candidate)
+        return matched
     except Exception as e:
         logger.error(f"TOTP verification error: {e}")
         return False
@@ -1,7 +1,7 @@
 import asyncio
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import select, update, func
+from sqlalchemy import select, update, func, tuple_
 from src.models.tables import Dependency
 from src.databases import db
 
@@ -30,7 +30,7 @@ class DependencyService:
         installed_at: Optional[datetime] = None,
     ):
         """Update dependency status in database"""
-        async for session in db.get_session():
+        async with db.session() as session:
             values = {"status": status}
             if error_message is not None:
                 values["error_message"] = error_message
@@ -50,7 +50,7 @@ class DependencyService:
         self, dependency_type: str, package_name: str, version: Optional[str]
     ) -> int:
         """Get existing dependency or create new one, returns dependency_id"""
-        async for session in db.get_session():
+        async with db.session() as session:
             result = await session.execute(
                 select(Dependency).where(
                     Dependency.dependency_type == dependency_type,
@@ -71,7 +71,6 @@ class DependencyService:
                 )
                 session.add(new_dep)
                 await session.commit()
-                await session.refresh(new_dep)
                 return new_dep.id
 
     def _build_install_command(
@@ -228,32 +227,46 @@ class DependencyService:
         status: Optional[str] = None,
         page: int = 1,
         page_size: int = 20,
+        before_created_at: Optional[datetime] = None,
+        before_id: Optional[int] = None,
     ) -> dict:
-        """List dependencies with pagination"""
-        async for session in db.get_session():
-            query = select(Dependency)
-
-            if dependency_type:
-                query = query.where(Dependency.dependency_type == dependency_type)
-            if status:
-                query = query.where(Dependency.status == status)
-
-            # Get total count
-            count_result = await session.execute(
-                select(func.count()).select_from(query.subquery())
+        """List dependencies with offset or keyset (cursor) pagination"""
+        filters = []
+        if dependency_type:
+            filters.append(Dependency.dependency_type == dependency_type)
+        if status:
+            filters.append(Dependency.status == status)
+
+        offset = (page - 1) * page_size
+        query = (
+            select(Dependency)
+            .where(*filters)
+            .order_by(Dependency.created_at.desc(), Dependency.id.desc())
+        )
+        keyset = before_created_at is not None and before_id is not None
+        if keyset:
+            # Seek past the cursor instead of scanning OFFSET rows
+            query = query.where(
+                tuple_(Dependency.created_at, Dependency.id)
+                < tuple_(before_created_at, before_id)
             )
-            total = count_result.scalar()
+        else:
+            query = query.offset(offset)
 
-            # Calculate pagination
-            offset = (page - 1) * page_size
-            total_pages = (total + page_size - 1) // page_size
+        async with db.session() as session:
+            if keyset:
+                # Cursor mode skips the full COUNT
+                total = total_pages = None
+            else:
+                # Get total count
+                count_result = await session.execute(
+                    select(func.count(Dependency.id)).where(*filters)
+                )
+                total = count_result.scalar()
+                total_pages = (total + page_size - 1) // page_size
 
             # Query paginated data
-            result = await session.execute(
-                query.order_by(Dependency.created_at.desc())
-                .offset(offset)
-                .limit(page_size)
-            )
+            result = await session.execute(query.limit(page_size))
             dependencies = result.scalars().all()
 
             items = [
@@ -277,6 +290,14 @@ class DependencyService:
                 "page": page,
                 "page_size": page_size,
                 "total_pages": total_pages,
+                "next_cursor": (
+                    {
+                        "before_created_at": dependencies[-1].created_at,
+                        "before_id": dependencies[-1].id,
+                    }
+                    if len(dependencies) == page_size
+                    else None
+                ),
             }
 
 
@@ -12,7 +12,7 @@ from src.models import Notification
 
 async def initialize_notifications():
     """Initialize default notification configurations for each type if not exists"""
-    async for session in db.get_session():
+    async with db.session() as session:
         notification_types = [
             {
                 "notify_type": "webhook",
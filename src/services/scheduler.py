@@ -1,17 +1,23 @@
 import asyncio
 import subprocess
 from datetime import datetime, timezone
-from croniter import croniter
+from enum import Enum
 from typing import Dict
 import json
 from sqlalchemy import select
 from src.databases import db
 from src.models import Task, TaskExecution, Notification
-from src.models.schemas import ExecutionStatus
+from src.models.schemas import ExecutionStatus, get_cached_croniter
 from src.services.notifiers import send_notification
 from src.utils import logger
 
 
+class ExecuteResult(str, Enum):
+    NOT_FOUND = "not_found"
+    ALREADY_RUNNING = "already_running"
+    STARTED = "started"
+
+
 class TaskScheduler:
     def __init__(self):
         self.running_tasks: Dict[int, asyncio.Task] = {}
@@ -38,56 +44,81 @@ class TaskScheduler:
 
     async def cancel_task(self, task_id: int) -> bool:
         """Cancel a running task"""
-        if task_id in self.running_tasks:
-            # Cancel asyncio task
-            self.running_tasks[task_id].cancel()
+        # Pop first: a concurrent cancel (or stop()) sees the task as gone
+        # instead of racing on the same entry
+        running = self.running_tasks.pop(task_id, None)
+        if running is None or running.done():
+            # Unknown, or finished and only waiting for the loop to reap it
+            return False
 
-            # Terminate process (if exists)
-            if task_id in self.running_processes:
-                try:
-                    process = self.running_processes[task_id]
-                    process.terminate()
-                    try:
-                        process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        process.kill()  # Force kill
-                    del self.running_processes[task_id]
-                except Exception as e:
-                    logger.error(f"Error terminating process for task {task_id}: {e}")
+        # Cancel asyncio task
+        running.cancel()
 
-            # Update execution record
+        # Terminate process (if exists) without blocking the event loop
+        process = self.running_processes.pop(task_id, None)
+        if process is not None:
             try:
-                async for session in db.get_session():
-                    result = await session.execute(
-                        select(TaskExecution)
-                        .where(TaskExecution.task_id == task_id)
-                        .where(TaskExecution.status == ExecutionStatus.RUNNING.value)
-                        .order_by(TaskExecution.started_at.desc())
-                        .limit(1)
-                    )
-                    execution = result.scalar_one_or_none()
-                    if execution:
-                        execution.finished_at = datetime.now(timezone.utc)
-                        execution.status = ExecutionStatus.CANCELLED.value
-                        execution.error = "Task cancelled by user"
-                        await session.commit()
+                process.terminate()
+                await asyncio.to_thread(self._wait_or_kill, process)
             except Exception as e:
-                logger.error(f"Error updating execution record: {e}")
+                logger.error(f"Error terminating process for task {task_id}: {e}")
 
-            del self.running_tasks[task_id]
-            logger.info(f"Task {task_id} cancelled successfully")
-            return True
-        return False
+        # Update execution record
+        try:
+            async with db.session() as session:
+                result = await session.execute(
+                    select(TaskExecution)
+                    .where(TaskExecution.task_id == task_id)
+                    .where(TaskExecution.status == ExecutionStatus.RUNNING.value)
+                    .order_by(TaskExecution.started_at.desc())
+                    .limit(1)
+                )
+                execution = result.scalar_one_or_none()
+                if execution:
+                    execution.finished_at = datetime.now(timezone.utc)
+                    execution.status = ExecutionStatus.CANCELLED.value
+                    execution.error = "Task cancelled by user"
+                    await session.commit()
+        except Exception as e:
+            logger.error(f"Error updating execution record: {e}")
+
+        logger.info(f"Task {task_id} cancelled successfully")
+        return True
+
+    @staticmethod
+    def _wait_or_kill(process: subprocess.Popen) -> None:
+        """Wait for a terminated process, force killing it after 5 seconds"""
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()  # Force kill
+
+    async def execute_task_now(self, task_id: int) -> ExecuteResult:
+        """Start a task immediately unless it is missing or already running"""
+        async with db.session() as session:
+            task = await session.get(Task, task_id)
+        if task is None:
+            return ExecuteResult.NOT_FOUND
+
+        # Checked after the await and right before registering, with no await in
+        # between, so overlapping calls cannot both start (and orphan) a run
+        running = self.running_tasks.get(task_id)
+        if running is not None and not running.done():
+            return ExecuteResult.ALREADY_RUNNING
+
+        self.running_tasks[task_id] = asyncio.create_task(self._execute_task(task))
+        return ExecuteResult.STARTED
 
     def get_running_tasks(self) -> list[int]:
-        """Get all running task IDs"""
-        return list(self.running_tasks.keys())
+        """Get all running task IDs (in-process snapshot, no DB access)"""
+        # Finished tasks linger until the next scheduler pass; skip them here
+        return [tid for tid, t in self.running_tasks.items() if not t.done()]
 
     async def _schedule_loop(self) -> None:
         """Main scheduling loop"""
         while not self.should_stop:
             try:
-                async for session in db.get_session():
+                async with db.session() as session:
                     result = await session.execute(
                         select(Task).where(Task.is_active == True)
                     )
@@ -146,11 +177,8 @@ class TaskScheduler:
         error: str = None,
     ) -> None:
         """Update execution record status"""
-        async for session in db.get_session():
-            result = await session.execute(
-                select(TaskExecution).where(TaskExecution.id == execution_id)
-            )
-            execution = result.scalar_one_or_none()
+        async with db.session() as session:
+            execution = await session.get(TaskExecution, execution_id)
             if execution:
                 execution.finished_at = datetime.now(timezone.utc)
                 execution.status = status
@@ -169,11 +197,12 @@ class TaskScheduler:
     async def _update_next_run_time(self, task_id: int, cron_expression: str) -> None:
         """Update task's next run time"""
         try:
-            async for session in db.get_session():
-                result = await session.execute(select(Task).where(Task.id == task_id))
-                task = result.scalar_one_or_none()
+            async with db.session() as session:
+                task = await session.get(Task, task_id)
                 if task:
-                    cron = croniter(cron_expression, datetime.now(timezone.utc))
+                    cron = get_cached_croniter(
+                        cron_expression, datetime.now(timezone.utc)
+                    )
                     task.next_run_time = cron.get_next(datetime)
                     await session.commit()
         except Exception as e:
@@ -203,11 +232,11 @@ class TaskScheduler:
     async def _should_run(self, task: Task, current_time: datetime) -> bool:
         """Check if task should run based on cron expression"""
         try:
-            cron = croniter(task.cron_expression, current_time)
+            cron = get_cached_croniter(task.cron_expression, current_time)
             prev_run = cron.get_prev(datetime)
 
             # Check if there's a recent execution
-            async for session in db.get_session():
+            async with db.session() as session:
                 result = await session.execute(
                     select(TaskExecution)
                     .where(TaskExecution.task_id == task.id)
@@ -230,7 +259,7 @@ class TaskScheduler:
         execution_id = None
         try:
             # Create execution record
-            async for session in db.get_session():
+            async with db.session() as session:
                 execution = TaskExecution(
                     task_id=task.id,
                     started_at=datetime.now(timezone.utc),
@@ -239,7 +268,6 @@ class TaskScheduler:
                 )
                 session.add(execution)
                 await session.commit()
-                await session.refresh(execution)
                 execution_id = execution.id
 
             # Execute command
@@ -319,7 +347,7 @@ class TaskScheduler:
         if not task.notification_ids:
             return  # No notifications configured, return early
 
-        async for session in db.get_session():
+        async with db.session() as session:
             # Get notification configuration details
             result = await session.execute(
                 select(Notification).where(Notification.id.in_(task.notification_ids))
@@ -1,9 +1,31 @@
+import os
 from pathlib import Path
 from typing import List, Optional, Tuple
 import asyncio
 from datetime import datetime
+from time import monotonic
 import re
 
+# File extension -> script type
+_EXT_TO_TYPE = {
+    ".py": "python",
+    ".js": "javascript",
+    ".sh": "shell",
+    ".bash": "shell",
+    ".zsh": "shell",
+}
+
+# Script type -> interpreter command
+_INTERPRETERS = {
+    "python": ["uv", "run"],
+    "javascript": ["node"],
+    "shell": ["bash"],
+}
+
+# The root mtime misses changes inside subdirectories and from other workers,
+# so a cached tree is also only trusted for a few seconds
+_TREE_CACHE_TTL = 5.0
+
 
 class ScriptService:
     """Script management service"""
@@ -21,31 +43,31 @@ class ScriptService:
         if self._initialized:
             return
         self.script_dir = self._script_dir
-        self.script_dir.mkdir(parents=True, exist_ok=True)
+        # Fixed for the process lifetime; avoids realpath() on every request
+        self._script_dir_resolved = self.script_dir.resolve()
+        self._cwd_resolved = Path.cwd().resolve()
+        self._script_dir_str = str(self._script_dir_resolved)
+        self._script_dir_prefix = os.path.join(self._script_dir_str, "")
+        # (script_dir mtime_ns, expires_at, tree); dropped on every write path
+        self._tree_cache: Optional[Tuple[int, float, List[dict]]] = None
+        # Bumped by every invalidation so an in-flight listing cannot store a
+        # tree built before a concurrent write
+        self._tree_generation = 0
         self._initialized = True
 
+    def ensure_script_dir(self) -> None:
+        """Create the scripts directory (called once at startup)"""
+        self.script_dir.mkdir(parents=True, exist_ok=True)
+
     @staticmethod
     def get_script_type(filename: str) -> str:
         """Determine script type from file extension"""
-        ext = Path(filename).suffix.lower()
-        type_map = {
-            ".py": "python",
-            ".js": "javascript",
-            ".sh": "shell",
-            ".bash": "shell",
-            ".zsh": "shell",
-        }
-        return type_map.get(ext, "unknown")
+        return _EXT_TO_TYPE.get(os.path.splitext(filename)[1].lower(), "unknown")
 
     @staticmethod
     def get_interpreter(script_type: str) -> Optional[List[str]]:
         """Get interpreter command for script type"""
-        interpreters = {
-            "python": ["uv", "run"],
-            "javascript": ["node"],
-            "shell": ["bash"],
-        }
-        return interpreters.get(script_type)
+        return _INTERPRETERS.get(script_type)
 
     def validate_path(
         self, script_path: str
@@ -60,54 +82,82 @@ class ScriptService:
             return False, f"Script '{script_path}' not found", None
 
         # Verify the path is within script_dir for security
-        try:
-            full_path.resolve().relative_to(self.script_dir.resolve())
-        except ValueError:
+        if not self.is_within_script_dir(full_path):
             return False, "Access denied: path outside script directory", None
 
         return True, None, full_path
 
-    def build_tree(self, directory: Path, base_path: Path) -> List[dict]:
-        """Build tree structure for scripts directory"""
-        nodes = []
+    def is_within_script_dir(self, path: Path) -> bool:
+        """Check that a path resolves to script_dir or somewhere below it"""
+        resolved = str(path.resolve())
+        return resolved == self._script_dir_str or resolved.startswith(
+            self._script_dir_prefix
+        )
 
+    def build_tree(self, directory: str, prefix: str = "") -> List[dict]:
+        """Build tree structure for scripts directory"""
+        # One pass over the directory: DirEntry caches the type from the
+        # directory read, so each entry is classified without extra stat calls
+        dirs, files = [], []
         try:
-            items = sorted(directory.iterdir(), key=lambda x: (not x.is_dir(), x.name))
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        dirs.append(entry)
+                    elif entry.is_file():
+                        script_type = self.get_script_type(entry.name)
+                        if script_type != "unknown":
+                            files.append((entry, script_type))
         except PermissionError:
-            return nodes
-
-        for item in items:
-            relative_path = str(item.relative_to(base_path))
-
-            if item.is_dir():
-                # Recursively build tree for subdirectories
-                children = self.build_tree(item, base_path)
-                nodes.append(
-                    {
-                        "name": item.name,
-                        "type": "directory",
-                        "path": relative_path,
-                        "children": children if children else [],
-                    }
-                )
-            elif item.is_file():
-                script_type = self.get_script_type(item.name)
-                if script_type != "unknown":
-                    nodes.append(
-                        {
-                            "name": item.name,
-                            "type": "file",
-                            "path": relative_path,
-                            "script_type": script_type,
-                            "children": None,
-                        }
-                    )
+            return []
+
+        dirs.sort(key=lambda e: e.name)
+        files.sort(key=lambda f: f[0].name)
+
+        nodes = []
+        for entry in dirs:
+            relative_path = os.path.join(prefix, entry.name) if prefix else entry.name
+            # Recursively build tree for subdirectories
+            nodes.append(
+                {
+                    "name": entry.name,
+                    "type": "directory",
+                    "path": relative_path,
+                    "children": self.build_tree(entry.path, relative_path),
+                }
+            )
+
+        for entry, script_type in files:
+            nodes.append(
+                {
+                    "name": entry.name,
+                    "type": "file",
+                    "path": os.path.join(prefix, entry.name) if prefix else entry.name,
+                    "script_type": script_type,
+                    "children": None,
+                }
+            )
 
         return nodes
 
     def list_scripts(self) -> List[dict]:
-        """List all scripts in tree structure"""
-        return self.build_tree(self.script_dir, self.script_dir)
+        """List all scripts in tree structure (briefly cached)"""
+        generation = self._tree_generation
+        mtime = self.script_dir.stat().st_mtime_ns
+        now = monotonic()
+        cached = self._tree_cache
+        if cached is not None and cached[0] == mtime and cached[1] > now:
+            return cached[2]
+
+        tree = self.build_tree(str(self.script_dir))
+        if self._tree_generation == generation:
+            self._tree_cache = (mtime, now + _TREE_CACHE_TTL, tree)
+        return tree
+
+    def _invalidate_tree(self) -> None:
+        """Drop the cached script tree after a change"""
+        self._tree_generation += 1
+        self._tree_cache = None
 
     def get_script(
         self, script_path: str
@@ -134,12 +184,28 @@ class ScriptService:
                     "name": script_path,
                     "type": script_type,
                     "content": content,
-                    "path": str(full_path.resolve().relative_to(Path.cwd().resolve())),
+                    "path": str(full_path.resolve().relative_to(self._cwd_resolved)),
                 },
             )
         except Exception as e:
             return False, str(e), None
 
+    def get_script_file(
+        self, script_path: str
+    ) -> Tuple[bool, Optional[str], Optional[Path]]:
+        """
+        Locate a script file without reading it (for streaming raw content)
+        Returns: (success, error_message, full_path)
+        """
+        is_valid, error_msg, full_path = self.validate_path(script_path)
+        if not is_valid:
+            return False, error_msg, None
+
+        if not full_path.is_file():
+            return False, f"'{script_path}' is not a file", None
+
+        return True, None, full_path
+
     def create_script(
         self, name: str, content: str
     ) -> Tuple[bool, Optional[str], Optional[dict]]:
@@ -151,6 +217,10 @@ class ScriptService:
         filename = name.replace("\\", "/")
         script_path = self.script_dir / filename
 
+        # Verify the path is within script_dir for security
+        if not self.is_within_script_dir(script_path):
+            return False, "Access denied: path outside script directory", None
+
         if script_path.exists():
             return False, f"Script '{filename}' already exists", None
 
@@ -163,6 +233,7 @@ class ScriptService:
             # Create parent directories if they don't exist
             script_path.parent.mkdir(parents=True, exist_ok=True)
             script_path.write_text(content, encoding="utf-8")
+            self._invalidate_tree()
 
             return (
                 True,
@@ -172,7 +243,7 @@ class ScriptService:
                     "type": script_type,
                     "content": content,
                     "path": str(
-                        script_path.resolve().relative_to(Path.cwd().resolve())
+                        script_path.resolve().relative_to(self._cwd_resolved)
                     ),
                 },
             )
@@ -202,9 +273,7 @@ class ScriptService:
         try:
             if new_filename != script_path:
                 # Verify the new path is within script_dir for security
-                try:
-                    new_path.resolve().relative_to(self.script_dir.resolve())
-                except ValueError:
+                if not self.is_within_script_dir(new_path):
                     return (
                         False,
                         "Access denied: path outside script directory",
@@ -218,6 +287,7 @@ class ScriptService:
                 new_path.parent.mkdir(parents=True, exist_ok=True)
                 old_path.rename(new_path)
                 old_path = new_path
+                self._invalidate_tree()
 
             old_path.write_text(content, encoding="utf-8")
 
@@ -228,7 +298,7 @@ class ScriptService:
                     "name": new_filename,
                     "type": script_type,
                     "content": content,
-                    "path": str(old_path.resolve().relative_to(Path.cwd().resolve())),
+                    "path": str(old_path.resolve().relative_to(self._cwd_resolved)),
                 },
             )
         except Exception as e:
@@ -249,19 +319,16 @@ class ScriptService:
         try:
             # Delete the file
             full_path.unlink()
+            self._invalidate_tree()
 
-            # Remove empty parent directories
+            # Remove empty parent directories; rmdir refuses non-empty ones
             parent = full_path.parent
-            while parent != self.script_dir and parent.exists():
+            while parent != self.script_dir:
                 try:
-                    # Only remove if directory is empty
-                    if not any(parent.iterdir()):
-                        parent.rmdir()
-                        parent = parent.parent
-                    else:
-                        break
-                except (OSError, PermissionError):
+                    os.rmdir(parent)
+                except OSError:
                     break
+                parent = parent.parent
 
             return True, None
         except Exception as e:
@@ -472,6 +539,7 @@ class ScriptService:
             stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=300)
 
             if process.returncode == 0:
+                self._invalidate_tree()
                 return {
                     "success": True,
                     "message": f"Successfully cloned repository to '{target_dir}'",
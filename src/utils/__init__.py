@@ -1,4 +1,15 @@
 from .logger import logger
-from .response import success_response, error_response
+from .response import (
+    success_response,
+    error_response,
+    success_json_response,
+    ORJSONModelResponse,
+)
 
-__all__ = ["logger", "success_response", "error_response"]
+__all__ = [
+    "logger",
+    "success_response",
+    "error_response",
+    "success_json_response",
+    "ORJSONModelResponse",
+]
@@ -1,16 +1,27 @@
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 from datetime import datetime
 from src.config import settings
 
 
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting (incl. tracebacks) to the listener"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 class Logger:
     """Unified logging management class"""
 
     def __init__(self):
         self.logger = logging.getLogger("Cronix")
         self.logger.setLevel(logging.DEBUG if settings.app_debug else logging.INFO)
+        self.listener = None
+        self._listening = False
 
         # Avoid adding duplicate handlers
         if not self.logger.handlers:
@@ -35,8 +46,25 @@ class Logger:
             console_handler.setFormatter(formatter)
             file_handler.setFormatter(formatter)
 
-            self.logger.addHandler(console_handler)
-            self.logger.addHandler(file_handler)
+            # Handlers run on a background listener thread, records are only
+            # queued on the caller's side
+            log_queue = queue.SimpleQueue()
+            self.listener = logging.handlers.QueueListener(
+                log_queue, console_handler, file_handler, respect_handler_level=True
+            )
+            self.logger.addHandler(_DeferredQueueHandler(log_queue))
+
+    def start(self) -> None:
+        """Start the background log listener"""
+        if self.listener and not self._listening:
+            self.listener.start()
+            self._listening = True
+
+    def stop(self) -> None:
+        """Flush queued records and stop the background log listener"""
+        if self.listener and self._listening:
+            self.listener.stop()
+            self._listening = False
 
     def debug(self, message: str) -> None:
         """Debug information"""
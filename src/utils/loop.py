@@ -0,0 +1,21 @@
+import asyncio
+
+
+def loop_name() -> str:
+    """Name of the best available event loop implementation"""
+    # Single place to switch implementations (e.g. an io_uring based loop)
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return "asyncio"
+    return "uvloop"
+
+
+def install_loop() -> str:
+    """Install the selected event loop policy and return its name"""
+    name = loop_name()
+    if name == "uvloop":
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return name
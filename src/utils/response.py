@@ -1,4 +1,7 @@
 from typing import Optional, Any
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
 
 
 def success_response(data: Optional[Any] = None, message: str = "Success") -> dict:
@@ -11,3 +14,33 @@ def error_response(
 ) -> dict:
     """Create an error response"""
     return {"code": code, "message": message, "data": data}
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Serialize objects orjson does not support natively"""
+    if isinstance(obj, BaseModel):
+        # Models built with model_construct may hold raw DB values (e.g. str
+        # for enum fields); those serialize fine, so skip the warnings
+        return obj.model_dump(warnings=False)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONModelResponse(Response):
+    """JSON response encoded by orjson, Pydantic models included, skipping jsonable_encoder"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # OPT_UTC_Z matches the "Z" suffix Pydantic uses for UTC datetimes
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+        )
+
+
+def success_json_response(
+    data: Optional[Any] = None, message: str = "Success"
+) -> ORJSONModelResponse:
+    """Create a successful response that is serialized directly by orjson"""
+    return ORJSONModelResponse(success_response(data=data, message=message))